@@ -1,8 +1,10 @@
 import asyncio
+import inspect
 import json
 import logging
+import random
 from abc import ABC, abstractmethod
-from typing import Callable, Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any, List
 from datetime import datetime
 
 from models import PriceData
@@ -19,6 +21,10 @@ logger = logging.getLogger(__name__)
 class DataListener(ABC):
     """Abstract base class for data listeners"""
     
+    # Listeners that coalesce bursts set this and accept a batch_callback
+    # keyword in start(), which is passed several ticks at once
+    supports_batches: bool = False
+    
     @abstractmethod
     async def start(self, callback: Callable[[PriceData], None]) -> None:
         """Start listening for data and call callback with received data"""
@@ -33,14 +39,35 @@ class DataListener(ABC):
 class WebSocketDataListener(DataListener):
     """WebSocket data listener for receiving streaming price data (requires websockets package)"""
     
-    def __init__(self, uri: str, reconnect_interval: int = 5):
+    supports_batches = True
+    
+    def __init__(self, uri: str, reconnect_interval: int = 5, read_limit: int = 2**20,
+                 max_size: int = 2**22, write_limit: int = 2**20, max_pending: int = 1024):
         self.uri = uri
         self.reconnect_interval = reconnect_interval
+        
+        # Buffer sizes passed to websockets.connect. Larger buffers mean fewer
+        # reads and wakeups per MB at high tick rates, at the cost of more
+        # memory held per connection and more data queued before back-pressure.
+        # read_limit only applies to the legacy client; the asyncio client
+        # (websockets 14+) has no such setting and it is ignored there.
+        self.read_limit = read_limit
+        self.max_size = max_size
+        self.write_limit = write_limit
+        
+        # Messages read but not yet delivered. When callbacks fall behind,
+        # the socket isn't read until there is room again, so back-pressure
+        # reaches the server instead of memory growing without bound.
+        self.max_pending = max_pending
         self.websocket = None
         self.running = False
         self.callback = None
+        self.batch_callback = None
+        self._callback_is_coro = False
+        self._batch_callback_is_coro = False
     
-    async def start(self, callback: Callable[[PriceData], None]) -> None:
+    async def start(self, callback: Callable[[PriceData], None],
+                    batch_callback: Optional[Callable[[List[PriceData]], None]] = None) -> None:
         """Start WebSocket connection and listen for data"""
         try:
             import websockets
@@ -48,33 +75,27 @@ class WebSocketDataListener(DataListener):
             raise ImportError("websockets package is required for WebSocket listener. Install with: pip install websockets")
         
         self.callback = callback
+        self._callback_is_coro = asyncio.iscoroutinefunction(callback)
+        self.batch_callback = batch_callback
+        self._batch_callback_is_coro = asyncio.iscoroutinefunction(batch_callback)
         self.running = True
         
+        connect_kwargs: Dict[str, Any] = {'max_size': self.max_size, 'write_limit': self.write_limit}
+        if 'read_limit' in inspect.signature(websockets.connect).parameters:
+            # Only the legacy client exposes the stream reader's buffer limit
+            connect_kwargs['read_limit'] = self.read_limit
+        else:
+            logger.info("read_limit is not supported by this websockets client and is ignored")
+        
         while self.running:
             try:
                 logger.info(f"Connecting to WebSocket: {self.uri}")
-                async with websockets.connect(self.uri) as websocket:
+                async with websockets.connect(self.uri, **connect_kwargs) as websocket:
                     self.websocket = websocket
                     logger.info("WebSocket connected successfully")
                     
-                    async for message in websocket:
-                        if not self.running:
-                            break
-                        
-                        try:
-                            # Parse incoming message as PriceData
-                            price_data = PriceData.from_json(message)
-                            logger.debug(f"Received data: {price_data}")
-                            
-                            # Call the callback with the parsed data
-                            if self.callback:
-                                await self._safe_callback(price_data)
-                                
-                        except json.JSONDecodeError as e:
-                            logger.error(f"Failed to parse JSON: {e}")
-                        except Exception as e:
-                            logger.error(f"Error processing message: {e}")
-                            
+                    await self._receive(websocket)
+                    
             except Exception as e:
                 if "ConnectionClosed" in str(type(e)):
                     logger.warning("WebSocket connection closed")
@@ -85,10 +106,94 @@ class WebSocketDataListener(DataListener):
                 logger.info(f"Reconnecting in {self.reconnect_interval} seconds...")
                 await asyncio.sleep(self.reconnect_interval)
     
+    async def _receive(self, websocket) -> None:
+        """Deliver incoming messages, coalescing those that arrive in a burst"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending)
+        reader = asyncio.create_task(self._read_frames(websocket, queue))
+        
+        try:
+            closed = False
+            while self.running and not closed:
+                # Wait for one message, then drain everything already queued
+                message = await queue.get()
+                batch = []
+                while True:
+                    if message is None:
+                        closed = True
+                        break
+                    price_data = self._parse(message)
+                    if price_data is not None:
+                        batch.append(price_data)
+                    if queue.empty():
+                        break
+                    message = queue.get_nowait()
+                
+                if batch and self.running:
+                    await self._deliver(batch)
+        finally:
+            if not reader.done():
+                reader.cancel()
+        
+        try:
+            # Re-raise connection errors from the reader for the reconnect loop
+            await reader
+        except asyncio.CancelledError:
+            pass
+    
+    async def _read_frames(self, websocket, queue: asyncio.Queue) -> None:
+        """Queue raw messages as they arrive; None marks the end of the connection"""
+        cancelled = False
+        try:
+            async for message in websocket:
+                await queue.put(message)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            # The end marker waits for room like any message. It is skipped
+            # when _receive cancelled this task, as nothing reads the queue then.
+            if not cancelled:
+                await queue.put(None)
+    
+    def _parse(self, message) -> Optional[PriceData]:
+        """Parse a message as PriceData, logging and skipping malformed ones"""
+        try:
+            # Binary frames go straight to the parser without a decode step
+            if isinstance(message, bytes):
+                price_data = PriceData.from_bytes(message)
+            else:
+                price_data = PriceData.from_json(message)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Received data: %s", price_data)
+            return price_data
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse JSON: {e}")
+        except Exception as e:
+            logger.error(f"Error processing message: {e}")
+        return None
+    
+    async def _deliver(self, batch: List[PriceData]) -> None:
+        """Hand a burst to batch_callback in one call, or tick by tick to callback"""
+        if len(batch) > 1 and self.batch_callback:
+            await self._safe_batch_callback(batch)
+        elif self.callback:
+            for price_data in batch:
+                await self._safe_callback(price_data)
+    
+    async def _safe_batch_callback(self, batch: List[PriceData]) -> None:
+        """Safely execute batch callback to prevent listener from crashing"""
+        try:
+            if self._batch_callback_is_coro:
+                await self.batch_callback(batch)
+            else:
+                self.batch_callback(batch)
+        except Exception as e:
+            logger.error(f"Error in batch callback: {e}")
+    
     async def _safe_callback(self, data: PriceData) -> None:
         """Safely execute callback to prevent listener from crashing"""
         try:
-            if asyncio.iscoroutinefunction(self.callback):
+            if self._callback_is_coro:
                 await self.callback(data)
             else:
                 self.callback(data)
@@ -104,7 +209,10 @@ class WebSocketDataListener(DataListener):
 
 
 class FileDataListener(DataListener):
-    """File-based data listener for testing purposes"""
+    """
+    File-based data listener for testing purposes
+    interval=0 replays the file as fast as possible (backtest mode)
+    """
     
     def __init__(self, file_path: str, interval: float = 1.0):
         self.file_path = file_path
@@ -114,12 +222,15 @@ class FileDataListener(DataListener):
     async def start(self, callback: Callable[[PriceData], None]) -> None:
         """Start reading data from file and simulate streaming"""
         self.running = True
+        callback_is_coro = asyncio.iscoroutinefunction(callback)
+        interval = self.interval
         
         try:
-            with open(self.file_path, 'r') as file:
+            # Lines are read as bytes and handed to the parser without decoding
+            with open(self.file_path, 'rb') as file:
                 logger.info(f"Reading data from file: {self.file_path}")
                 
-                for line in file:
+                for i, line in enumerate(file):
                     if not self.running:
                         break
                     
@@ -128,15 +239,21 @@ class FileDataListener(DataListener):
                         continue
                     
                     try:
-                        price_data = PriceData.from_json(line)
-                        logger.debug(f"File data: {price_data}")
+                        price_data = PriceData.from_bytes(line)
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("File data: %s", price_data)
                         
-                        if asyncio.iscoroutinefunction(callback):
+                        if callback_is_coro:
                             await callback(price_data)
                         else:
                             callback(price_data)
                         
-                        await asyncio.sleep(self.interval)
+                        if interval > 0:
+                            await asyncio.sleep(interval)
+                        elif i & 0xFF == 0:
+                            # Fast replay: yield to the event loop every 256
+                            # records instead of sleeping after each one
+                            await asyncio.sleep(0)
                         
                     except Exception as e:
                         logger.error(f"Error processing line: {e}")
@@ -164,16 +281,22 @@ class MockDataListener(DataListener):
     async def start(self, callback: Callable[[PriceData], None]) -> None:
         """Start generating mock price data"""
         self.running = True
-        import random
+        
+        # The callback's kind never changes, so check it once rather than per tick
+        callback_is_coro = asyncio.iscoroutinefunction(callback)
         
         logger.info(f"Starting mock data generation for {self.symbol}")
         
         current_price = self.base_price
         
+        # A private generator with its method bound once keeps module and
+        # attribute lookups out of the generation loop
+        uniform = random.Random().uniform
+        
         while self.running:
             try:
                 # Generate realistic price movement
-                change_percent = random.uniform(-0.02, 0.02)  # ±2% change
+                change_percent = uniform(-0.02, 0.02)  # ±2% change
                 current_price *= (1 + change_percent)
                 
                 price_data = PriceData(
@@ -182,9 +305,10 @@ class MockDataListener(DataListener):
                     symbol=self.symbol
                 )
                 
-                logger.debug(f"Generated mock data: {price_data}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Generated mock data: %s", price_data)
                 
-                if asyncio.iscoroutinefunction(callback):
+                if callback_is_coro:
                     await callback(price_data)
                 else:
                     callback(price_data)
@@ -1,12 +1,16 @@
 import asyncio
 import logging
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any, Tuple
 from datetime import datetime
-from collections import deque
+
+import numpy as np
 
 from models import PriceData
 from data_listener import DataListener, MockDataListener, FileDataListener
-from trading_strategies import TradingStrategy, SimpleMovingAverageStrategy, RSIStrategy, MomentumStrategy
+from trading_strategies import (
+    TradingStrategy, SimpleMovingAverageStrategy, RSIStrategy, MomentumStrategy, CombinedStrategyEngine,
+    SIGNAL_BUY, SIGNAL_SELL, SIGNAL_HOLD, SIGNAL_NAMES
+)
 
 
 # Configure logging
@@ -23,22 +27,99 @@ class TradingAssistant:
     def __init__(self, max_history: int = 1000):
         self.data_listener: Optional[DataListener] = None
         self.strategies: List[TradingStrategy] = []
-        self.price_history: deque = deque(maxlen=max_history)
+        
+        # Built-in strategies are evaluated together by a fused engine; any
+        # other strategy is run individually. Both plans pre-bind what the
+        # per-tick loop needs: (engine signal index | bound analyze, name, strategy)
+        self._engine: Optional[CombinedStrategyEngine] = None
+        self._engine_targets: List[Tuple[int, str, TradingStrategy]] = []
+        self._unfused_strategies: List[Tuple[Callable, str, TradingStrategy]] = []
+        self._planned = False  # Plans are built when the assistant starts or on the first tick
         self.running = False
         self.stats = {
             'total_signals': 0,
-            'buy_signals': 0,
-            'sell_signals': 0,
-            'hold_signals': 0,
             'last_signal': None,
             'last_price': None,
             'start_time': None
         }
+        
+        # Signal counts indexed by signal value: [HOLD, BUY, SELL] (SELL is -1)
+        self._signal_counts = [0, 0, 0]
+        
+        # Price history is a fixed-size ring buffer of prices, so appending a
+        # tick never allocates. Prices are written twice, at i and
+        # i + max_history, so the newest max_history prices are always one
+        # contiguous slice and strategies get a view instead of a copy.
+        self.max_history = max_history
+        self._prices = np.empty(2 * max_history, dtype=np.float64)
+        self._head = 0
+        self._count = 0
+    
+    @property
+    def price_history(self) -> np.ndarray:
+        """Buffered prices in chronological order (oldest first), as a view"""
+        if self._count < self.max_history:
+            return self._prices[:self._count]
+        return self._prices[self._head:self._head + self.max_history]
+    
+    @property
+    def buy_signals(self) -> int:
+        """Number of BUY signals emitted"""
+        return self._signal_counts[SIGNAL_BUY]
+    
+    @property
+    def sell_signals(self) -> int:
+        """Number of SELL signals emitted"""
+        return self._signal_counts[SIGNAL_SELL]
+    
+    @property
+    def hold_signals(self) -> int:
+        """Number of HOLD signals counted"""
+        return self._signal_counts[SIGNAL_HOLD]
+    
+    def add_price_data(self, data: PriceData) -> None:
+        """Append price data to the history ring buffer"""
+        head = self._head
+        self._prices[head] = self._prices[head + self.max_history] = data.price
+        
+        self._head = (head + 1) % self.max_history
+        if self._count < self.max_history:
+            self._count += 1
     
     def add_strategy(self, strategy: TradingStrategy) -> None:
         """Add a trading strategy to the assistant"""
         self.strategies.append(strategy)
-        logger.info(f"Added strategy: {strategy.__class__.__name__}")
+        self._planned = False
+        logger.info(f"Added strategy: {strategy.name}")
+    
+    def _plan_strategies(self) -> None:
+        """Route the first SMA, RSI and momentum strategy through the fused engine"""
+        fused: Dict[type, TradingStrategy] = {}
+        self._unfused_strategies = []
+        
+        for strategy in self.strategies:
+            kind = type(strategy)
+            if kind in (SimpleMovingAverageStrategy, RSIStrategy, MomentumStrategy) and kind not in fused:
+                fused[kind] = strategy
+            else:
+                # Compile now rather than stall the event loop on the first tick
+                strategy.prepare()
+                self._unfused_strategies.append((strategy.analyze, strategy.name, strategy))
+        
+        # Building the engine compiles its kernel, so it happens once per plan
+        # rather than on every add_strategy call
+        self._engine = CombinedStrategyEngine(
+            sma=fused.get(SimpleMovingAverageStrategy),
+            rsi=fused.get(RSIStrategy),
+            momentum=fused.get(MomentumStrategy)
+        ) if fused else None
+        
+        self._engine_targets = [
+            (index, strategy.name, strategy)
+            for index, strategy in enumerate(self._engine.strategies if self._engine else ())
+            if strategy is not None
+        ]
+        self._planned = True
     
     def set_data_listener(self, listener: DataListener) -> None:
         """Set the data listener for receiving price data"""
@@ -49,12 +130,12 @@ class TradingAssistant:
         """Callback function called when new price data is received"""
         try:
             # Add to history
-            self.price_history.append(data)
+            self.add_price_data(data)
             
             # Update stats
             self.stats['last_price'] = data.price
             
-            logger.info(f"Received: {data}")
+            logger.info("Received: %s", data)
             
             # Run strategies if we have any
             if self.strategies:
@@ -63,41 +144,87 @@ class TradingAssistant:
         except Exception as e:
             logger.error(f"Error processing data: {e}")
     
+    async def on_batch_received(self, batch: List[PriceData]) -> None:
+        """
+        Callback function called with a burst of price data
+        Every tick is added to history, but strategies run once, on the latest tick
+        """
+        try:
+            for data in batch:
+                self.add_price_data(data)
+            
+            latest = batch[-1]
+            self.stats['last_price'] = latest.price
+            
+            logger.info("Received %d data points, latest: %s", len(batch), latest)
+            
+            if self.strategies:
+                await self._analyze_with_strategies(latest)
+            
+        except Exception as e:
+            logger.error(f"Error processing data batch: {e}")
+    
     async def _analyze_with_strategies(self, data: PriceData) -> None:
         """Analyze data with all configured strategies"""
-        history_list = list(self.price_history)
+        if not self._planned:
+            self._plan_strategies()
         
-        for strategy in self.strategies:
+        history = self.price_history
+        
+        if self._engine:
+            try:
+                signals = self._engine.analyze(history)
+            except Exception as e:
+                # Fall back to the member strategies one by one, so an error
+                # in one only drops that strategy's signal
+                logger.error(f"Error in strategy engine: {e}")
+                for index, name, strategy in self._engine_targets:
+                    try:
+                        signal = strategy.analyze(data, history)
+                        if signal:
+                            await self._handle_signal(signal, data, strategy, name)
+                    except Exception as e:
+                        logger.error(f"Error in strategy {name}: {e}")
+            else:
+                for index, name, strategy in self._engine_targets:
+                    signal = signals[index]
+                    if not signal:
+                        continue
+                    try:
+                        await self._handle_signal(signal, data, strategy, name)
+                    except Exception as e:
+                        logger.error(f"Error in strategy {name}: {e}")
+        
+        for analyze, name, strategy in self._unfused_strategies:
             try:
-                signal = strategy.analyze(data, history_list)
-                
-                if signal and signal != 'HOLD':
-                    self.stats['total_signals'] += 1
-                    self.stats['last_signal'] = signal
-                    
-                    if signal == 'BUY':
-                        self.stats['buy_signals'] += 1
-                    elif signal == 'SELL':
-                        self.stats['sell_signals'] += 1
-                    else:
-                        self.stats['hold_signals'] += 1
-                    
-                    logger.info(f"🔔 {strategy.__class__.__name__} Signal: {signal} at ${data.price}")
-                    await self._execute_signal(signal, data, strategy)
-                
+                signal = analyze(data, history)
+                if signal:
+                    await self._handle_signal(signal, data, strategy, name)
             except Exception as e:
-                logger.error(f"Error in strategy {strategy.__class__.__name__}: {e}")
+                logger.error(f"Error in strategy {name}: {e}")
+    
+    async def _handle_signal(self, signal: int, data: PriceData, strategy: TradingStrategy, name: str) -> None:
+        """Record a strategy's BUY/SELL signal and execute it"""
+        signal_name = SIGNAL_NAMES[signal]
+        self._signal_counts[signal] += 1
+        self.stats['total_signals'] += 1
+        self.stats['last_signal'] = signal_name
+        
+        logger.info("🔔 %s Signal: %s at $%s", name, signal_name, data.price)
+        # The execution hook keeps its 'BUY'/'SELL' string contract
+        await self._execute_signal(signal_name, data, strategy)
     
     async def _execute_signal(self, signal: str, data: PriceData, strategy: TradingStrategy) -> None:
         """Execute trading signal (placeholder for actual trading logic)"""
         # This is where you would integrate with a real trading API
         # For now, we just log the signal
-        timestamp = data.date.strftime('%Y-%m-%d %H:%M:%S')
-        
-        if signal == 'BUY':
-            logger.info(f"📈 EXECUTE BUY: {data.symbol or 'UNKNOWN'} at ${data.price} ({timestamp})")
-        elif signal == 'SELL':
-            logger.info(f"📉 EXECUTE SELL: {data.symbol or 'UNKNOWN'} at ${data.price} ({timestamp})")
+        if logger.isEnabledFor(logging.INFO):
+            timestamp = data.date.strftime('%Y-%m-%d %H:%M:%S')
+            
+            if signal == 'BUY':
+                logger.info("📈 EXECUTE BUY: %s at $%s (%s)", data.symbol or 'UNKNOWN', data.price, timestamp)
+            elif signal == 'SELL':
+                logger.info("📉 EXECUTE SELL: %s at $%s (%s)", data.symbol or 'UNKNOWN', data.price, timestamp)
     
     def print_stats(self) -> None:
         """Print current statistics"""
@@ -105,16 +232,16 @@ class TradingAssistant:
         print("📊 Trading Assistant Statistics")
         print("="*50)
         print(f"Running time: {datetime.now() - self.stats['start_time'] if self.stats['start_time'] else 'Not started'}")
-        print(f"Price history: {len(self.price_history)} data points")
+        print(f"Price history: {self._count} data points")
         print(f"Last price: ${self.stats['last_price']}")
         print(f"Total signals: {self.stats['total_signals']}")
-        print(f"  • Buy signals: {self.stats['buy_signals']}")
-        print(f"  • Sell signals: {self.stats['sell_signals']}")
-        print(f"  • Hold signals: {self.stats['hold_signals']}")
+        print(f"  • Buy signals: {self.buy_signals}")
+        print(f"  • Sell signals: {self.sell_signals}")
+        print(f"  • Hold signals: {self.hold_signals}")
         print(f"Last signal: {self.stats['last_signal']}")
         print(f"Active strategies: {len(self.strategies)}")
         for i, strategy in enumerate(self.strategies, 1):
-            print(f"  {i}. {strategy.__class__.__name__}")
+            print(f"  {i}. {strategy.name}")
         print("="*50)
     
     async def start(self) -> None:
@@ -129,7 +256,13 @@ class TradingAssistant:
         logger.info(f"Configured with {len(self.strategies)} strategies")
         
         try:
-            await self.data_listener.start(self.on_data_received)
+            if not self._planned:
+                self._plan_strategies()
+            
+            if self.data_listener.supports_batches:
+                await self.data_listener.start(self.on_data_received, batch_callback=self.on_batch_received)
+            else:
+                await self.data_listener.start(self.on_data_received)
         except KeyboardInterrupt:
             logger.info("Received interrupt signal")
         except Exception as e:
@@ -148,6 +281,15 @@ class TradingAssistant:
         self.print_stats()
 
 
+def run_event_loop(coro) -> Any:
+    """Run a coroutine like asyncio.run, on uvloop's faster event loop when it is installed"""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(coro)
+    return uvloop.run(coro)
+
+
 async def main():
     """Main function demonstrating the trading assistant"""
     print("🤖 Automated Trading Assistant")
@@ -230,10 +372,11 @@ async def create_sample_data_file(file_path: str):
     sample_data = []
     base_price = 50000.0
     start_time = datetime.now() - timedelta(hours=1)
+    uniform = random.Random().uniform  # Bound once instead of looked up per point
     
     for i in range(60):  # 60 data points
         # Simulate price movement
-        change = random.uniform(-0.02, 0.02)  # ±2%
+        change = uniform(-0.02, 0.02)  # ±2%
         base_price *= (1 + change)
         
         data_point = {
@@ -250,4 +393,4 @@ async def create_sample_data_file(file_path: str):
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run_event_loop(main())
@@ -2,9 +2,26 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 import json
+import sys
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
-@dataclass
+try:
+    from ciso8601 import parse_datetime as _parse_datetime
+except ImportError:
+    if sys.version_info >= (3, 11):
+        # fromisoformat accepts a trailing 'Z' from 3.11 on
+        _parse_datetime = datetime.fromisoformat
+    else:
+        def _parse_datetime(value: str) -> datetime:
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+@dataclass(slots=True, frozen=True)
 class PriceData:
     """Data structure for incoming price data"""
     date: datetime
@@ -15,7 +32,7 @@ class PriceData:
     def from_dict(cls, data: dict) -> 'PriceData':
         """Create PriceData from dictionary"""
         if isinstance(data['date'], str):
-            date = datetime.fromisoformat(data['date'].replace('Z', '+00:00'))
+            date = _parse_datetime(data['date'])
         else:
             date = data['date']
         
@@ -28,7 +45,13 @@ class PriceData:
     @classmethod
     def from_json(cls, json_str: str) -> 'PriceData':
         """Create PriceData from JSON string"""
-        data = json.loads(json_str)
+        data = _loads(json_str)
+        return cls.from_dict(data)
+    
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> 'PriceData':
+        """Create PriceData from raw UTF-8 JSON bytes without decoding to str first"""
+        data = _loads(raw)
         return cls.from_dict(data)
     
     def to_dict(self) -> dict:
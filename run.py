@@ -2,9 +2,8 @@
 """
 Quick start script for the Vibe Trader Assistant
 """
-import asyncio
 import sys
-from main import TradingAssistant
+from main import TradingAssistant, run_event_loop
 from data_listener import MockDataListener, FileDataListener
 from trading_strategies import SimpleMovingAverageStrategy, RSIStrategy, MomentumStrategy
 
@@ -40,10 +39,10 @@ if __name__ == "__main__":
     if len(sys.argv) > 1 and sys.argv[1] == "--demo":
         # Quick demo mode
         try:
-            asyncio.run(quick_demo())
+            run_event_loop(quick_demo())
         except KeyboardInterrupt:
             print("\n👋 Demo stopped. Thanks for trying Vibe Trader!")
     else:
         # Full interactive mode
         from main import main
-        asyncio.run(main())
+        run_event_loop(main())
@@ -8,8 +8,11 @@ from datetime import datetime, timedelta
 import json
 
 from models import PriceData
-from data_listener import MockDataListener, FileDataListener
-from trading_strategies import SimpleMovingAverageStrategy, RSIStrategy, MomentumStrategy
+from data_listener import MockDataListener, FileDataListener, WebSocketDataListener
+from trading_strategies import (
+    TradingStrategy, SimpleMovingAverageStrategy, RSIStrategy, MomentumStrategy, CombinedStrategyEngine,
+    SIGNAL_BUY, SIGNAL_HOLD
+)
 from main import TradingAssistant
 
 
@@ -20,11 +23,12 @@ async def create_test_data_file():
     data_points = []
     base_price = 50000.0
     start_time = datetime.now() - timedelta(hours=2)
+    gauss = random.Random().gauss
     
     # Generate 120 data points (2 hours of minute data)
     for i in range(120):
         # Add some realistic volatility
-        change = random.gauss(0, 0.01)  # Normal distribution with 1% std dev
+        change = gauss(0, 0.01)  # Normal distribution with 1% std dev
         base_price *= (1 + change)
         base_price = max(base_price, 1000)  # Prevent negative prices
         
@@ -107,7 +111,7 @@ async def test_single_data_point():
     
     # Add to history
     for data in test_data:
-        assistant.price_history.append(data)
+        assistant.add_price_data(data)
     
     # Test with new data point
     new_data = PriceData(datetime.now(), 50500.0, "BTC-USD")
@@ -116,6 +120,231 @@ async def test_single_data_point():
     print("✅ Single data point test completed")
 
 
+async def test_price_history_wraparound():
+    """Test that the history ring buffer keeps the newest prices in order"""
+    print("\n🧪 Testing Price History Wraparound")
+    print("-" * 40)
+    
+    assistant = TradingAssistant(max_history=5)
+    start_time = datetime.now()
+    
+    for i in range(12):
+        assistant.add_price_data(PriceData(start_time + timedelta(minutes=i), 100.0 + i, "BTC-USD"))
+    
+    history = assistant.price_history
+    assert list(history) == [107.0, 108.0, 109.0, 110.0, 111.0], f"Unexpected history: {history}"
+    
+    print("✅ Price history wraparound test completed")
+
+
+async def test_combined_engine():
+    """Test that the fused engine agrees with the individual strategies"""
+    print("\n🧪 Testing Combined Strategy Engine")
+    print("-" * 40)
+    
+    import random
+    import numpy as np
+    
+    sma = SimpleMovingAverageStrategy(short_window=5, long_window=15)
+    rsi = RSIStrategy(period=10, oversold=35, overbought=65)
+    momentum = MomentumStrategy(lookback_period=8, threshold=0.008)
+    engine = CombinedStrategyEngine(sma=sma, rsi=rsi, momentum=momentum)
+    
+    prices = []
+    price = 50000.0
+    start_time = datetime.now()
+    
+    for i in range(200):
+        price = round(price * (1 + random.gauss(0, 0.01)), 2)
+        prices.append(price)
+        data = PriceData(start_time + timedelta(minutes=i), price, "BTC-USD")
+        history = np.array(prices[-50:])
+        
+        expected = tuple(strategy.analyze(data, history) for strategy in (sma, rsi, momentum))
+        assert engine.analyze(history) == expected, f"Engine mismatch at tick {i}"
+    
+    # A zero past price only holds momentum; the SMA signal still comes through
+    zero_engine = CombinedStrategyEngine(
+        sma=SimpleMovingAverageStrategy(short_window=2, long_window=4),
+        momentum=MomentumStrategy(lookback_period=3, threshold=0.01)
+    )
+    signals = zero_engine.analyze(np.array([1.0, 2.0, 3.0, 0.0, 4.0, 5.0]))
+    assert signals == (SIGNAL_BUY, SIGNAL_HOLD, SIGNAL_HOLD), f"Unexpected signals: {signals}"
+    
+    print("✅ Combined strategy engine test completed")
+
+
+async def test_sma_batched_history():
+    """Test that an SMA strategy stays exact when batches skip analyze calls"""
+    print("\n🧪 Testing SMA With Batched History")
+    print("-" * 40)
+    
+    import random
+    
+    assistant = TradingAssistant(max_history=50)
+    sma = SimpleMovingAverageStrategy(short_window=3, long_window=10)
+    engine = CombinedStrategyEngine(sma=SimpleMovingAverageStrategy(short_window=3, long_window=10))
+    
+    rng = random.Random(3)
+    price = 100.0
+    start_time = datetime.now()
+    
+    for i in range(300):
+        # Between analyze calls, add a batch of 1 to 12 ticks to history
+        for _ in range(rng.randint(1, 12)):
+            price *= 1 + rng.gauss(0, 0.01)
+            data = PriceData(start_time + timedelta(seconds=i), price, "BTC-USD")
+            assistant.add_price_data(data)
+        
+        history = assistant.price_history
+        expected = engine.analyze(history)[0]
+        assert sma.analyze(data, history) == expected, f"SMA mismatch after batch {i}"
+    
+    print("✅ SMA batched history test completed")
+
+
+async def test_batch_processing():
+    """Test that a coalesced burst of data is fully recorded and analyzed once"""
+    print("\n🧪 Testing Batch Processing")
+    print("-" * 40)
+    
+    class RecordingStrategy(TradingStrategy):
+        """Records the ticks it is asked to analyze"""
+        
+        def __init__(self):
+            self.calls = []
+        
+        def analyze(self, data, history):
+            self.calls.append((data, history[-1], len(history)))
+            return SIGNAL_HOLD
+    
+    assistant = TradingAssistant(max_history=100)
+    assistant.add_strategy(SimpleMovingAverageStrategy(short_window=3, long_window=10))
+    assistant.add_strategy(RSIStrategy(period=10))
+    recorder = RecordingStrategy()
+    assistant.add_strategy(recorder)
+    
+    start_time = datetime.now()
+    batch = [
+        PriceData(start_time + timedelta(seconds=i), 50000.0 + (i % 7) * 25, "BTC-USD")
+        for i in range(30)
+    ]
+    await assistant.on_batch_received(batch)
+    
+    assert len(assistant.price_history) == 30, f"Expected 30 data points, got {len(assistant.price_history)}"
+    assert assistant.stats['last_price'] == batch[-1].price
+    
+    # Strategies run once, on the latest tick, with the whole batch in history
+    assert recorder.calls == [(batch[-1], batch[-1].price, 30)], f"Unexpected strategy calls: {recorder.calls}"
+    
+    print("✅ Batch processing test completed")
+
+
+async def test_websocket_bursts():
+    """Test burst coalescing, queue bounds and reconnects with a fake websocket"""
+    print("\n🧪 Testing WebSocket Burst Handling")
+    print("-" * 40)
+    
+    import sys
+    import types
+    
+    max_pending = 4
+    listener = WebSocketDataListener("ws://fake", reconnect_interval=0, max_pending=max_pending)
+    read = []
+    delivered = []
+    batch_sizes = []
+    connects = []
+    
+    class FakeWebSocket:
+        """Yields a burst of messages, then ends or raises"""
+        
+        def __init__(self, prices, error=None):
+            self.prices = list(prices)
+            self.error = error
+        
+        def __aiter__(self):
+            return self
+        
+        async def __anext__(self):
+            if not self.prices:
+                if self.error:
+                    raise self.error
+                raise StopAsyncIteration
+            price = self.prices.pop(0)
+            read.append(price)
+            return json.dumps({"date": "2025-06-21T10:30:00", "price": price})
+        
+        async def close(self):
+            self.prices = []
+        
+        async def __aenter__(self):
+            return self
+        
+        async def __aexit__(self, *exc_info):
+            return False
+    
+    # The first connection drops mid-stream, the second ends normally
+    sessions = [
+        FakeWebSocket([100.0 + i for i in range(12)], error=ConnectionError("feed dropped")),
+        FakeWebSocket([200.0 + i for i in range(12)]),
+    ]
+    
+    def connect(uri, **kwargs):
+        connects.append(uri)
+        if not sessions:
+            listener.running = False
+            raise OSError("no more sessions")
+        return sessions.pop(0)
+    
+    def check_back_pressure():
+        # Once the queue is full the reader stops reading: at most max_pending
+        # queued messages plus one waiting for room may be undelivered
+        assert len(read) - len(delivered) <= max_pending + 1, f"Read {len(read)}, delivered {len(delivered)}"
+    
+    async def on_data(data):
+        delivered.append(data.price)
+        check_back_pressure()
+        await asyncio.sleep(0)
+    
+    async def on_batch(batch):
+        batch_sizes.append(len(batch))
+        delivered.extend(data.price for data in batch)
+        check_back_pressure()
+        for _ in range(3):
+            await asyncio.sleep(0)  # Slow consumer, so the queue fills up
+    
+    errors = []
+    
+    class ErrorHandler(logging.Handler):
+        def emit(self, record):
+            errors.append(record.getMessage())
+    
+    handler = ErrorHandler(level=logging.ERROR)
+    listener_logger = logging.getLogger('data_listener')
+    listener_logger.addHandler(handler)
+    real_websockets = sys.modules.get('websockets')
+    sys.modules['websockets'] = types.SimpleNamespace(connect=connect)
+    try:
+        await asyncio.wait_for(listener.start(on_data, batch_callback=on_batch), timeout=10)
+    finally:
+        listener_logger.removeHandler(handler)
+        if real_websockets is None:
+            del sys.modules['websockets']
+        else:
+            sys.modules['websockets'] = real_websockets
+    
+    expected = [100.0 + i for i in range(12)] + [200.0 + i for i in range(12)]
+    assert delivered == expected, f"Unexpected delivery order: {delivered}"
+    assert batch_sizes and max(batch_sizes) <= max_pending, f"Unexpected batch sizes: {batch_sizes}"
+    assert max(batch_sizes) > 1, "Burst was not coalesced"
+    
+    # The reader's error reached start's reconnect loop, which connected again
+    assert "WebSocket error: feed dropped" in errors, f"Unexpected errors: {errors}"
+    assert len(connects) == 3, f"Expected 3 connection attempts, got {len(connects)}"
+    
+    print("✅ WebSocket burst handling test completed")
+
+
 async def main():
     """Run all tests"""
     print("🚀 Trading Assistant Test Suite")
@@ -126,6 +355,11 @@ async def main():
     
     try:
         await test_single_data_point()
+        await test_price_history_wraparound()
+        await test_combined_engine()
+        await test_sma_batched_history()
+        await test_batch_processing()
+        await test_websocket_bursts()
         await test_mock_data()
         await test_file_data()
         
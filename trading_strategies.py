@@ -1,21 +1,269 @@
 from abc import ABC, abstractmethod
-from typing import List
+from functools import lru_cache
+from typing import Callable, Optional, Tuple
 from models import PriceData
 import logging
 
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # Without numba the kernels below run as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
 logger = logging.getLogger(__name__)
 
+# Trading signals returned by strategies
+SIGNAL_BUY = 1
+SIGNAL_SELL = -1
+SIGNAL_HOLD = 0
+
+# Display names indexed by signal (-1 wraps to 'SELL')
+SIGNAL_NAMES = ('HOLD', 'BUY', 'SELL')
+
+
+@njit(cache=True, inline='always')
+def _sma_signal(prices, short_w, long_w):
+    """
+    SMA crossover over the tail of prices, recomputed from the last long_w + 1 prices
+    Sums run oldest first, like the fused engine, so both break ties the same way
+    Returns: SIGNAL_BUY, SIGNAL_SELL or SIGNAL_HOLD
+    """
+    n = prices.shape[0]
+    if n < long_w + 1:
+        return 0  # Not enough data
+    
+    short_sum = 0.0
+    long_sum = 0.0
+    prev_short_sum = 0.0
+    prev_long_sum = 0.0
+    for i in range(n - long_w - 1, n):
+        price = prices[i]
+        back = n - 1 - i
+        if back < short_w:
+            short_sum += price
+        if back < long_w:
+            long_sum += price
+        if 1 <= back <= short_w:
+            prev_short_sum += price
+        if back >= 1:
+            prev_long_sum += price
+    
+    short_ma = short_sum / short_w
+    long_ma = long_sum / long_w
+    prev_short_ma = prev_short_sum / short_w
+    prev_long_ma = prev_long_sum / long_w
+    
+    # Crossover detection against the previous tick's averages
+    if short_ma > long_ma and prev_short_ma <= prev_long_ma:
+        return 1
+    elif short_ma < long_ma and prev_short_ma >= prev_long_ma:
+        return -1
+    return 0
+
+
+@njit(cache=True, inline='always')
+def _rsi_signal(prices, period, oversold, overbought):
+    """RSI over the last period+1 prices. Returns: SIGNAL_BUY, SIGNAL_SELL or SIGNAL_HOLD"""
+    n = prices.shape[0]
+    if n < period + 1:
+        return 0
+    
+    gain_sum = 0.0
+    loss_sum = 0.0
+    for i in range(n - period, n):
+        change = prices[i] - prices[i - 1]
+        if change > 0:
+            gain_sum += change
+        else:
+            loss_sum -= change
+    
+    if loss_sum == 0:
+        rsi = 100.0
+    else:
+        # period cancels out of avg_gain / avg_loss
+        rs = gain_sum / loss_sum
+        rsi = 100.0 - (100.0 / (1.0 + rs))
+    
+    if rsi < oversold:
+        return 1
+    elif rsi > overbought:
+        return -1
+    return 0
+
+
+@njit(cache=True, inline='always')
+def _momentum_signal(prices, lookback, threshold):
+    """Momentum of the last price vs lookback ticks ago. Returns: SIGNAL_BUY, SIGNAL_SELL or SIGNAL_HOLD"""
+    n = prices.shape[0]
+    if n < lookback:
+        return 0
+    
+    past_price = prices[n - lookback]
+    momentum = (prices[n - 1] - past_price) / past_price
+    
+    if momentum > threshold:
+        return 1
+    elif momentum < -threshold:
+        return -1
+    return 0
+
+
+@njit(cache=True, inline='always')
+def _combined_signals(prices, short_w, long_w, period, oversold, overbought, lookback, threshold):
+    """
+    SMA crossover, RSI and momentum signals from a single pass over the tail of prices
+    A window of 0 disables that indicator (its signal is 0)
+    Returns: (sma, rsi, momentum), each SIGNAL_BUY, SIGNAL_SELL or SIGNAL_HOLD
+    """
+    n = prices.shape[0]
+    span = max(long_w + 1, period + 1, lookback)
+    
+    short_sum = 0.0
+    long_sum = 0.0
+    prev_short_sum = 0.0
+    prev_long_sum = 0.0
+    gain_sum = 0.0
+    loss_sum = 0.0
+    
+    # back is the distance from the newest price (0 = newest)
+    for i in range(max(n - span, 0), n):
+        price = prices[i]
+        back = n - 1 - i
+        
+        if back < short_w:
+            short_sum += price
+        if back < long_w:
+            long_sum += price
+        if 1 <= back <= short_w:
+            prev_short_sum += price
+        if 1 <= back <= long_w:
+            prev_long_sum += price
+        
+        if back < period and i > 0:
+            change = price - prices[i - 1]
+            if change > 0:
+                gain_sum += change
+            else:
+                loss_sum -= change
+    
+    # Moving average crossover (needs the previous tick's averages too)
+    sma = 0
+    if long_w > 0 and n >= long_w + 1:
+        short_ma = short_sum / short_w
+        long_ma = long_sum / long_w
+        prev_short_ma = prev_short_sum / short_w
+        prev_long_ma = prev_long_sum / long_w
+        if short_ma > long_ma and prev_short_ma <= prev_long_ma:
+            sma = 1
+        elif short_ma < long_ma and prev_short_ma >= prev_long_ma:
+            sma = -1
+    
+    # RSI
+    rsi_signal = 0
+    if period > 0 and n >= period + 1:
+        if loss_sum == 0:
+            rsi = 100.0
+        else:
+            rsi = 100.0 - (100.0 / (1.0 + gain_sum / loss_sum))
+        if rsi < oversold:
+            rsi_signal = 1
+        elif rsi > overbought:
+            rsi_signal = -1
+    
+    # Momentum (undefined against a zero past price, which must not take the
+    # other two signals down with it)
+    momentum_signal = 0
+    if lookback > 0 and n >= lookback and prices[n - lookback] != 0:
+        past_price = prices[n - lookback]
+        momentum = (prices[n - 1] - past_price) / past_price
+        if momentum > threshold:
+            momentum_signal = 1
+        elif momentum < -threshold:
+            momentum_signal = -1
+    
+    return sma, rsi_signal, momentum_signal
+
+
+# The factories below compile a kernel per parameter set with the parameters
+# captured as compile-time constants, so loop trip counts are known and the
+# generic kernel inlined into it can be unrolled. Identical parameter sets
+# share one compiled kernel. Specialized kernels can't use numba's on-disk
+# cache, so they are only built for strategies that will run them, and are
+# warmed when built so compilation happens before the first tick.
+
+@lru_cache(maxsize=None)
+def _make_sma_kernel(short_w: int, long_w: int) -> Callable:
+    """_sma_signal specialized for fixed window sizes"""
+    @njit
+    def kernel(prices):
+        return _sma_signal(prices, short_w, long_w)
+    
+    kernel(np.ones(long_w + 1))
+    return kernel
+
+
+@lru_cache(maxsize=None)
+def _make_rsi_kernel(period: int, oversold: float, overbought: float) -> Callable:
+    """_rsi_signal specialized for a fixed period and thresholds"""
+    @njit
+    def kernel(prices):
+        return _rsi_signal(prices, period, oversold, overbought)
+    
+    kernel(np.ones(period + 1))
+    return kernel
+
+
+@lru_cache(maxsize=None)
+def _make_momentum_kernel(lookback: int, threshold: float) -> Callable:
+    """_momentum_signal specialized for a fixed lookback and threshold"""
+    @njit
+    def kernel(prices):
+        return _momentum_signal(prices, lookback, threshold)
+    
+    kernel(np.ones(max(lookback, 1)))
+    return kernel
+
+
+@lru_cache(maxsize=None)
+def _make_combined_kernel(short_w: int, long_w: int, period: int, oversold: float,
+                          overbought: float, lookback: int, threshold: float) -> Callable:
+    """_combined_signals specialized for fixed strategy parameters"""
+    @njit
+    def kernel(prices):
+        return _combined_signals(prices, short_w, long_w, period, oversold, overbought, lookback, threshold)
+    
+    kernel(np.ones(max(long_w + 1, period + 1, lookback, 1)))
+    return kernel
+
 
 class TradingStrategy(ABC):
     """Abstract base class for trading strategies"""
     
+    # Display name used in logs and stats; defaults to the subclass name
+    name: str = 'TradingStrategy'
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if 'name' not in cls.__dict__:
+            cls.name = cls.__name__
+    
     @abstractmethod
-    def analyze(self, data: PriceData, history: List[PriceData]) -> str:
+    def analyze(self, data: PriceData, history: np.ndarray) -> int:
         """
         Analyze price data and return trading signal
-        Returns: 'BUY', 'SELL', or 'HOLD'
+        history: buffered prices in chronological order, ending with data.price
+        Returns: SIGNAL_BUY, SIGNAL_SELL, or SIGNAL_HOLD
         """
         pass
+    
+    def prepare(self) -> None:
+        """Do one-off setup (e.g. compiling kernels) before the first analyze call"""
+        pass
 
 
 class SimpleMovingAverageStrategy(TradingStrategy):
@@ -24,31 +272,18 @@ class SimpleMovingAverageStrategy(TradingStrategy):
     def __init__(self, short_window: int = 5, long_window: int = 20):
         self.short_window = short_window
         self.long_window = long_window
+        self._kernel: Optional[Callable] = None  # Compiled by prepare()
     
-    def analyze(self, data: PriceData, history: List[PriceData]) -> str:
+    def prepare(self) -> None:
+        """Compile the kernel specialized for these windows"""
+        if self._kernel is None:
+            self._kernel = _make_sma_kernel(self.short_window, self.long_window)
+    
+    def analyze(self, data: PriceData, history: np.ndarray) -> int:
         """Analyze using moving average crossover"""
-        if len(history) < self.long_window:
-            return 'HOLD'  # Not enough data
-        
-        # Get recent prices
-        recent_prices = [d.price for d in history[-self.long_window:]]
-        
-        # Calculate moving averages
-        short_ma = sum(recent_prices[-self.short_window:]) / self.short_window
-        long_ma = sum(recent_prices) / self.long_window
-        
-        # Previous short MA for trend detection
-        if len(history) >= self.long_window + 1:
-            prev_prices = [d.price for d in history[-self.long_window-1:-1]]
-            prev_short_ma = sum(prev_prices[-self.short_window:]) / self.short_window
-            
-            # Crossover detection
-            if short_ma > long_ma and prev_short_ma <= sum(prev_prices) / self.long_window:
-                return 'BUY'
-            elif short_ma < long_ma and prev_short_ma >= sum(prev_prices) / self.long_window:
-                return 'SELL'
-        
-        return 'HOLD'
+        if self._kernel is None:
+            self.prepare()
+        return self._kernel(history)
 
 
 class RSIStrategy(TradingStrategy):
@@ -58,38 +293,18 @@ class RSIStrategy(TradingStrategy):
         self.period = period
         self.oversold = oversold
         self.overbought = overbought
+        self._kernel: Optional[Callable] = None  # Compiled by prepare()
+    
+    def prepare(self) -> None:
+        """Compile the kernel specialized for this period and thresholds"""
+        if self._kernel is None:
+            self._kernel = _make_rsi_kernel(self.period, float(self.oversold), float(self.overbought))
     
-    def analyze(self, data: PriceData, history: List[PriceData]) -> str:
+    def analyze(self, data: PriceData, history: np.ndarray) -> int:
         """Analyze using RSI"""
-        if len(history) < self.period + 1:
-            return 'HOLD'
-        
-        # Calculate price changes
-        prices = [d.price for d in history[-self.period-1:]]
-        price_changes = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-        
-        # Separate gains and losses
-        gains = [change if change > 0 else 0 for change in price_changes]
-        losses = [-change if change < 0 else 0 for change in price_changes]
-        
-        # Calculate average gains and losses
-        avg_gain = sum(gains) / len(gains) if gains else 0
-        avg_loss = sum(losses) / len(losses) if losses else 0
-        
-        # Calculate RSI
-        if avg_loss == 0:
-            rsi = 100
-        else:
-            rs = avg_gain / avg_loss
-            rsi = 100 - (100 / (1 + rs))
-        
-        # Generate signals
-        if rsi < self.oversold:
-            return 'BUY'
-        elif rsi > self.overbought:
-            return 'SELL'
-        else:
-            return 'HOLD'
+        if self._kernel is None:
+            self.prepare()
+        return self._kernel(history[-self.period-1:])
 
 
 class MomentumStrategy(TradingStrategy):
@@ -98,21 +313,43 @@ class MomentumStrategy(TradingStrategy):
     def __init__(self, lookback_period: int = 10, threshold: float = 0.02):
         self.lookback_period = lookback_period
         self.threshold = threshold  # 2% threshold
+        self._kernel: Optional[Callable] = None  # Compiled by prepare()
     
-    def analyze(self, data: PriceData, history: List[PriceData]) -> str:
+    def prepare(self) -> None:
+        """Compile the kernel specialized for this lookback and threshold"""
+        if self._kernel is None:
+            self._kernel = _make_momentum_kernel(self.lookback_period, float(self.threshold))
+    
+    def analyze(self, data: PriceData, history: np.ndarray) -> int:
         """Analyze using price momentum"""
-        if len(history) < self.lookback_period:
-            return 'HOLD'
-        
-        # Calculate momentum (price change over lookback period)
-        current_price = data.price
-        past_price = history[-self.lookback_period].price
-        
-        momentum = (current_price - past_price) / past_price
+        if self._kernel is None:
+            self.prepare()
+        return self._kernel(history[-self.lookback_period:])
+
+
+class CombinedStrategyEngine:
+    """Runs the built-in SMA, RSI and momentum strategies in one fused pass over the price history"""
+    
+    def __init__(self, sma: Optional[SimpleMovingAverageStrategy] = None,
+                 rsi: Optional[RSIStrategy] = None,
+                 momentum: Optional[MomentumStrategy] = None):
+        self.strategies = (sma, rsi, momentum)
         
-        if momentum > self.threshold:
-            return 'BUY'
-        elif momentum < -self.threshold:
-            return 'SELL'
-        else:
-            return 'HOLD'
+        # Kernel specialized for these parameters; a window of 0 disables a
+        # missing strategy
+        self._kernel = _make_combined_kernel(
+            sma.short_window if sma else 0,
+            sma.long_window if sma else 0,
+            rsi.period if rsi else 0,
+            float(rsi.oversold) if rsi else 0.0,
+            float(rsi.overbought) if rsi else 0.0,
+            momentum.lookback_period if momentum else 0,
+            float(momentum.threshold) if momentum else 0.0,
+        )
+    
+    def analyze(self, history: np.ndarray) -> Tuple[int, int, int]:
+        """
+        Analyze the price history with all three strategies at once
+        Returns: (sma_signal, rsi_signal, momentum_signal), each SIGNAL_BUY, SIGNAL_SELL, or SIGNAL_HOLD
+        """
+        return self._kernel(history)